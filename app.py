@@ -1,141 +1,581 @@
-# app.py - Mongo removed; file-backed JSON storage (vaderSentiment)
+# app.py - Mongo removed; SQLite storage in WAL mode (vaderSentiment)
 import os
-import json
+import time
+import hashlib
+import hmac
+import sqlite3
 import threading
-from uuid import uuid4
-from flask import Flask, render_template, request, jsonify, make_response
+from flask import Flask, Response, g, render_template, request, jsonify, make_response
+from flask.json.provider import JSONProvider
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 import datetime
 from datetime import timedelta
 import re
 import jwt
+import orjson
 import bcrypt
-from functools import wraps
+from functools import lru_cache, wraps
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import ahocorasick
+from cachetools import TTLCache
 import logging
 
+class ORJSONProvider(JSONProvider):
+    """jsonify/get_json through orjson (C) instead of the stdlib json module."""
+    option = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=self.option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # hand the bytes straight to the response instead of a decode/encode round trip
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj, option=self.option), mimetype="application/json")
+
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 app.secret_key = os.environ.get("FLASK_SECRET_KEY", "your_secret_key_here")
 app.config['JWT_SECRET_KEY'] = os.environ.get("JWT_SECRET_KEY", "jwt_secret_key_here")
 
-# Sentiment analyzer (vaderSentiment) — no downloads required
-sia = SentimentIntensityAnalyzer()
+# Sentiment analyzer (vaderSentiment) — no downloads required; the lexicon ships with the
+# package and is parsed once per process on first use
+@lru_cache(maxsize=1)
+def get_sia():
+    return SentimentIntensityAnalyzer()
+
 def ensure_sia():
-    return sia is not None
+    try:
+        return get_sia() is not None
+    except Exception:
+        app.logger.exception("Could not load the VADER lexicon")
+        return False
 
 # Storage configuration
-DATA_FILE = os.environ.get("DATA_FILE", "data.json")
-_data_lock = threading.Lock()
-_data = None  # lazy-loaded dict with keys: 'users' and 'entries'
+DATABASE_FILE = os.environ.get("DATABASE_FILE", "diary.sqlite3")
+DATA_FILE = os.environ.get("DATA_FILE", "data.json")  # legacy JSON store, imported once
+_db_local = threading.local()  # one connection per thread (and per process, see _thread_db)
+_db_init_lock = threading.Lock()
+_db_ready = False
+
+# WAL checkpoints run on a background thread rather than inside request commits, and at
+# most about as often as SQLite's own default (every 1000 pages) so fsyncs are coalesced
+CHECKPOINT_INTERVAL = float(os.environ.get("CHECKPOINT_INTERVAL", "30"))  # seconds
+CHECKPOINT_BATCH = 1000  # wake the checkpointer early once this many writes are pending
+# SQLite's autocheckpoint stays on as a backstop in case the checkpointer falls behind or dies
+WAL_AUTOCHECKPOINT_PAGES = 10000
+_checkpoint_lock = threading.Lock()
+_checkpoint_wakeup = threading.Event()
+_checkpoint_pid = None
+_pending_writes = 0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    username TEXT UNIQUE,
+    email TEXT UNIQUE,
+    password TEXT,
+    created_at TEXT
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id TEXT PRIMARY KEY,
+    date TEXT,
+    entry TEXT,
+    created_at TEXT,
+    compound REAL,
+    pos REAL,
+    neg REAL,
+    neu REAL,
+    entry_date TEXT,
+    token_count INTEGER
+);
+-- bumped in the same transaction as every entry write; read-side caches key on it
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('entries_version', 0);
+"""
+
+INDEXES = """
+DROP INDEX IF EXISTS idx_entries_created_at;
+DROP INDEX IF EXISTS idx_entries_created_at_id;
+-- expression index on the exact sort key of list_entries (legacy rows may lack created_at)
+CREATE INDEX IF NOT EXISTS idx_entries_created_key_id ON entries (COALESCE(created_at, '') DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_entries_date ON entries (date);
+DROP INDEX IF EXISTS idx_entries_entry_date;
+-- covering index: the daily-average GROUP BY reads only this b-tree, never the table rows
+CREATE INDEX IF NOT EXISTS idx_entries_entry_date_compound ON entries (entry_date, compound);
+"""
+
+PARALLEL_SCORING_MIN = 256  # below this, process start-up costs more than it saves
+
+USER_COLUMNS = ("id", "username", "email", "password", "created_at")
+ENTRY_COLUMNS = ("id", "date", "entry", "created_at", "compound", "pos", "neg", "neu", "entry_date", "token_count")
 
 # -------------------------
-# Storage helpers (file-backed)
+# Storage helpers (SQLite)
 # -------------------------
-def _init_data_structure():
-    return {"users": [], "entries": []}
-
-def load_data():
-    """Load data.json into memory. Creates file if missing."""
-    global _data
-    with _data_lock:
-        if _data is not None:
-            return _data
-        if not os.path.exists(DATA_FILE):
-            _data = _init_data_structure()
-            save_data()
-            return _data
-        try:
-            with open(DATA_FILE, "r", encoding="utf-8") as f:
-                _data = json.load(f)
-                # Ensure keys exist
-                if "users" not in _data:
-                    _data["users"] = []
-                if "entries" not in _data:
-                    _data["entries"] = []
-        except Exception:
-            # If file corrupted, reinitialize to avoid crash
-            _data = _init_data_structure()
-            save_data()
-        return _data
-
-def save_data():
-    """Persist _data to DATA_FILE atomically."""
-    global _data
-    with _data_lock:
-        if _data is None:
+SCORE_KEYS = ("compound", "pos", "neg", "neu")
+# What VADER returns for blank/whitespace-only text
+_BLANK_SCORES = (0.0, 0.0, 0.0, 0.0)
+
+# Memoized per process: text that was just analyzed is not re-scored when it is saved
+@lru_cache(maxsize=4096)
+def _cached_scores(text):
+    scores = get_sia().polarity_scores(text)
+    return tuple(scores[key] for key in SCORE_KEYS)
+
+def score_entry(text):
+    """VADER scores persisted on each entry (compound/pos/neg/neu)."""
+    if not text or text.isspace():
+        return dict(zip(SCORE_KEYS, _BLANK_SCORES))
+    return dict(zip(SCORE_KEYS, _cached_scores(text)))
+
+def token_count(text):
+    """Whitespace token count (how VADER splits text); weights the entry in aggregate scores."""
+    return len(text.split())
+
+_uuid_local = threading.local()
+
+def fast_uuid4():
+    """Version-4 UUID string sliced from a per-thread os.urandom buffer (256 ids per read)."""
+    buf = getattr(_uuid_local, "buf", None)
+    if buf is None or _uuid_local.off >= len(buf) or _uuid_local.pid != os.getpid():
+        # refill on exhaustion, and after a fork so parent and child never share bytes
+        buf = _uuid_local.buf = os.urandom(4096)
+        _uuid_local.off = 0
+        _uuid_local.pid = os.getpid()
+    off = _uuid_local.off
+    _uuid_local.off = off + 16
+    b = bytearray(buf[off:off + 16])
+    b[6] = (b[6] & 0x0f) | 0x40  # version 4
+    b[8] = (b[8] & 0x3f) | 0x80  # RFC 4122 variant
+    h = b.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+def score_entries(texts):
+    """score_entry over many texts; large batches fan out across CPU cores (VADER is pure Python)."""
+    # Only for the one-shot legacy import: forking a pool from a request thread would
+    # multiply processes by workers x threads, so request handlers call score_entry
+    if len(texts) < PARALLEL_SCORING_MIN:
+        return [score_entry(text) for text in texts]
+    # workers load the lexicon up front instead of inside their first task
+    with ProcessPoolExecutor(max_workers=os.cpu_count(), initializer=get_sia) as pool:
+        return list(pool.map(score_entry, texts, chunksize=32))
+
+def _connect():
+    conn = sqlite3.connect(DATABASE_FILE, timeout=30)
+    conn.row_factory = sqlite3.Row
+    # WAL lets readers proceed while a writer is active; NORMAL only fsyncs at checkpoints
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute(f"PRAGMA wal_autocheckpoint={WAL_AUTOCHECKPOINT_PAGES}")
+    return conn
+
+_inherited_conns = []  # handles copied in from a parent process; never used nor closed here
+
+def _thread_db():
+    conn = getattr(_db_local, "conn", None)
+    # a connection inherited across fork (gunicorn preload) must not be used in the child,
+    # nor closed there (garbage collection would close it), so it is parked and left alone
+    if conn is None or _db_local.pid != os.getpid():
+        if conn is not None:
+            _inherited_conns.append(conn)
+        conn = _db_local.conn = _connect()
+        _db_local.pid = os.getpid()
+    return conn
+
+def close_db():
+    """Close this thread's connection, e.g. in the gunicorn master before it forks workers."""
+    conn = getattr(_db_local, "conn", None)
+    if conn is not None and _db_local.pid == os.getpid():
+        conn.close()
+    _db_local.conn = None
+
+def get_db():
+    """Return this thread's connection, creating the schema on first use."""
+    conn = _thread_db()
+    if not _db_ready:
+        init_db()
+    return conn
+
+def init_db():
+    """Create tables/indexes and import a legacy data.json if the DB is empty."""
+    global _db_ready
+    with _db_init_lock:
+        if _db_ready:
             return
-        tmp_path = DATA_FILE + ".tmp"
-        with open(tmp_path, "w", encoding="utf-8") as f:
-            json.dump(_data, f, ensure_ascii=False, indent=2, default=str)
-        os.replace(tmp_path, DATA_FILE)
+        conn = _thread_db()
+        conn.executescript(SCHEMA)
+        _migrate(conn)
+        conn.executescript(INDEXES)
+        _import_legacy_json(conn)
+        _db_ready = True
+
+def _migrate(conn):
+    """Bring a database created by an older version up to the current schema."""
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(entries)")}
+    if "entry_date" not in columns:
+        with conn:
+            conn.execute("ALTER TABLE entries ADD COLUMN entry_date TEXT")
+            # 'date' is "%A, %Y-%m-%d", so its last 10 characters are the ISO date
+            conn.execute("UPDATE entries SET entry_date = substr(date, -10) WHERE date LIKE '%, ____-__-__'")
+    if "token_count" not in columns:
+        with conn:
+            conn.execute("ALTER TABLE entries ADD COLUMN token_count INTEGER")
+            rows = conn.execute("SELECT id, entry FROM entries").fetchall()
+            conn.executemany("UPDATE entries SET token_count = ? WHERE id = ?",
+                             [(token_count(entry or ""), entry_id) for entry_id, entry in rows])
+
+def _iso_date(date_str):
+    """ISO date from the display format "%A, %Y-%m-%d", or None if it doesn't match."""
+    # the last 10 characters are the ISO date; fromisoformat is a C fast path (unlike strptime)
+    # and also rejects impossible dates such as 2024-02-30
+    if not date_str or date_str[-12:-10] != ", ":
+        return None
+    try:
+        return datetime.date.fromisoformat(date_str[-10:]).isoformat()
+    except ValueError:
+        return None
+
+def _checkpoint_loop():
+    global _pending_writes, _checkpoint_pid
+    try:
+        conn = _connect()
+        while True:
+            _checkpoint_wakeup.wait(CHECKPOINT_INTERVAL)
+            _checkpoint_wakeup.clear()
+            with _checkpoint_lock:
+                pending, _pending_writes = _pending_writes, 0
+            if not pending:
+                continue
+            try:
+                # PASSIVE never blocks readers or writers; frames still in use are retried next round
+                conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+            except Exception:
+                app.logger.exception("WAL checkpoint failed")
+    except Exception:
+        app.logger.exception("WAL checkpointer stopped")
+    finally:
+        # let the next write start a fresh checkpointer instead of assuming this one runs
+        with _checkpoint_lock:
+            _checkpoint_pid = None
+
+def _note_write():
+    """Record a committed write and make sure this process has a checkpointer running."""
+    global _pending_writes, _checkpoint_pid
+    with _checkpoint_lock:
+        _pending_writes += 1
+        pending = _pending_writes
+        if _checkpoint_pid != os.getpid():  # not started yet, or lost across a fork
+            _checkpoint_pid = os.getpid()
+            threading.Thread(target=_checkpoint_loop, name="wal-checkpoint", daemon=True).start()
+    if pending >= CHECKPOINT_BATCH:
+        _checkpoint_wakeup.set()
+
+def _mark_legacy_imported(conn):
+    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('legacy_imported', 1)")
+
+def _import_legacy_json(conn):
+    # data.json stays on disk, so the marker (not table emptiness) is what makes this one-shot:
+    # otherwise a cleared diary would be re-imported on the next start
+    if conn.execute("SELECT 1 FROM meta WHERE key = 'legacy_imported'").fetchone():
+        return
+    if not os.path.exists(DATA_FILE):
+        return
+    if conn.execute("SELECT 1 FROM users UNION ALL SELECT 1 FROM entries LIMIT 1").fetchone():
+        # imported by a version that predates the marker
+        with conn:
+            _mark_legacy_imported(conn)
+        return
+    try:
+        with open(DATA_FILE, "rb") as f:
+            legacy = orjson.loads(f.read())
+    except Exception:
+        app.logger.exception("Could not read legacy %s; skipping import", DATA_FILE)
+        return
+    entries = legacy.get("entries", [])
+    # one-shot backfill of cached sentiment scores for entries saved without them
+    unscored = [e for e in entries if "scores" not in e]
+    for e, scores in zip(unscored, score_entries([e.get("entry", "") for e in unscored])):
+        e["scores"] = scores
+    for e in entries:
+        e.update(e.pop("scores"))
+        e.setdefault("entry_date", _iso_date(e.get("date")))
+        e.setdefault("token_count", token_count(e.get("entry", "")))
+    with conn:
+        conn.executemany(_insert_sql("users", USER_COLUMNS, "OR IGNORE"),
+                         [tuple(u.get(c) for c in USER_COLUMNS) for u in legacy.get("users", [])])
+        conn.executemany(_insert_sql("entries", ENTRY_COLUMNS, "OR IGNORE"),
+                         [tuple(e.get(c) for c in ENTRY_COLUMNS) for e in entries])
+        _bump_entries_version(conn)
+        _mark_legacy_imported(conn)
+    # checkpoint the one-shot import right here rather than starting a checkpointer thread
+    # (init_db may run in the gunicorn master, which should hold no threads or connections)
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    app.logger.info("Imported %d users and %d entries from %s",
+                    len(legacy.get("users", [])), len(entries), DATA_FILE)
+
+def _insert_sql(table, columns, conflict=""):
+    placeholders = ", ".join("?" for _ in columns)
+    return f"INSERT {conflict} INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+
+def utc_now():
+    """Current UTC time as a naive datetime, the form created_at has always been stored in."""
+    # utcnow() is deprecated; drop tzinfo so no "+00:00" suffix changes how rows sort
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+def utc_now_iso():
+    return utc_now().isoformat()
+
+_today_cache = (None, None)  # (date, "%A, %Y-%m-%d"), swapped as one tuple
+
+def today_and_display_date():
+    """Today's date and its display string; strftime runs once per day."""
+    global _today_cache
+    today = datetime.date.today()
+    if today != _today_cache[0]:
+        _today_cache = (today, today.strftime("%A, %Y-%m-%d"))
+    return _today_cache
 
 # Convenience wrappers to work like collection operations
-def find_users(filter_fn=None):
-    data = load_data()
-    users = data["users"]
-    return [u for u in users if (filter_fn(u) if filter_fn else True)]
+def find_user(username=None, email=None):
+    """First user whose username, then email, matches (both columns are UNIQUE-indexed)."""
+    conn = get_db()
+    for column, value in (("username", username), ("email", email)):
+        if value is None:
+            continue
+        row = conn.execute(f"SELECT * FROM users WHERE {column} = ?", (value,)).fetchone()
+        if row:
+            return dict(row)
+    return None
 
 def insert_user(user_obj):
-    data = load_data()
-    with _data_lock:
-        data["users"].append(user_obj)
-        save_data()
+    conn = get_db()
+    with conn:
+        conn.execute(_insert_sql("users", USER_COLUMNS), tuple(user_obj.get(c) for c in USER_COLUMNS))
+    _note_write()
     return user_obj
 
-def find_entries(filter_fn=None):
-    data = load_data()
-    entries = data["entries"]
-    return [e for e in entries if (filter_fn(e) if filter_fn else True)]
+def update_user_password(user_id, password_hash):
+    conn = get_db()
+    with conn:
+        conn.execute("UPDATE users SET password = ? WHERE id = ?", (password_hash, user_id))
+    _note_write()
+
+def list_entries(limit, before=None):
+    """One page of the public view (date/entry/id), newest first, after entry id ``before`` (None if unknown)."""
+    # keyset pagination on (created_at, id): pages stay stable while entries are added;
+    # COALESCE keeps rows with a NULL created_at (legacy imports) comparable, sorted last
+    conn = get_db()
+    sql = "SELECT date, entry, id FROM entries"
+    params = []
+    if before:
+        cursor = conn.execute("SELECT COALESCE(created_at, ''), id FROM entries WHERE id = ?", (before,)).fetchone()
+        if cursor is None:
+            return None
+        # the redundant <= bound lets SQLite seek the expression index instead of scanning it
+        sql += " WHERE COALESCE(created_at, '') <= ? AND (COALESCE(created_at, ''), id) < (?, ?)"
+        params.extend((cursor[0], *cursor))
+    sql += " ORDER BY COALESCE(created_at, '') DESC, id DESC LIMIT ?"
+    params.append(limit)
+    rows = conn.execute(sql, params)
+    return [{"date": date, "entry": entry, "id": entry_id} for date, entry, entry_id in rows]
+
+def find_entries_on(date_str):
+    """Entries whose display date equals date_str (uses the date index), oldest first."""
+    # insertion (rowid) order, as data.json kept them: callers join the texts for VADER, and
+    # its "but" rule makes the score depend on which entry comes first
+    rows = get_db().execute("SELECT * FROM entries WHERE date = ? ORDER BY rowid", (date_str,))
+    return [dict(row) for row in rows]
+
+def daily_compound_averages(lo, hi):
+    """{entry_date: mean compound} over the range, grouped inside SQLite via the entry_date index."""
+    rows = get_db().execute(
+        "SELECT entry_date, AVG(compound) FROM entries WHERE entry_date BETWEEN ? AND ?"
+        " GROUP BY entry_date ORDER BY entry_date", (lo, hi))
+    return dict(rows.fetchall())
+
+def weighted_entry_scores(lo=None, hi=None):
+    """Token-weighted mean of per-entry scores, over lo <= entry_date <= hi if given; None if no words."""
+    sql = ("SELECT SUM(compound * token_count), SUM(pos * token_count), SUM(neg * token_count),"
+           " SUM(neu * token_count), SUM(token_count) FROM entries WHERE token_count > 0")
+    params = ()
+    if lo is not None:
+        sql += " AND entry_date BETWEEN ? AND ?"
+        params = (lo, hi)
+    row = get_db().execute(sql, params).fetchone()
+    *sums, total = row
+    if not total:
+        return None
+    return {key: round(value / total, 4) for key, value in zip(SCORE_KEYS, sums)}
+
+def count_entries_by_sentiment():
+    """(positive, neutral, negative) entry counts, bucketed inside SQLite in one pass."""
+    # Same +/-0.05 cut-offs as get_sentiment_category
+    row = get_db().execute(
+        "SELECT COALESCE(SUM(compound >= 0.05), 0),"
+        " COALESCE(SUM(compound > -0.05 AND compound < 0.05), 0),"
+        " COALESCE(SUM(compound <= -0.05), 0)"
+        " FROM entries"
+    ).fetchone()
+    return tuple(row)
+
+def entries_version():
+    """Counter that changes whenever entries change, in any process."""
+    return get_db().execute("SELECT value FROM meta WHERE key = 'entries_version'").fetchone()[0]
+
+def _bump_entries_version(conn):
+    conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'entries_version'")
 
 def insert_entry(entry_obj):
-    data = load_data()
-    with _data_lock:
-        data["entries"].append(entry_obj)
-        save_data()
+    conn = get_db()
+    with conn:
+        conn.execute(_insert_sql("entries", ENTRY_COLUMNS), tuple(entry_obj.get(c) for c in ENTRY_COLUMNS))
+        _bump_entries_version(conn)
+    _note_write()
     return entry_obj
 
+def insert_entries(entry_objs):
+    """Insert many entries with one executemany in a single transaction."""
+    conn = get_db()
+    with conn:
+        conn.executemany(_insert_sql("entries", ENTRY_COLUMNS),
+                         [tuple(e.get(c) for c in ENTRY_COLUMNS) for e in entry_objs])
+        _bump_entries_version(conn)
+    _note_write()
+    return entry_objs
+
 def delete_all_entries():
-    data = load_data()
-    with _data_lock:
-        data["entries"] = []
-        save_data()
+    conn = get_db()
+    with conn:
+        conn.execute("DELETE FROM entries")
+        _bump_entries_version(conn)
+    _note_write()
 
 # -------------------------
 # JWT helpers
 # -------------------------
+TOKEN_LIFETIME = 24 * 60 * 60  # seconds
+
+# sha256(token) -> (user_id, exp); entries past their exp are never returned
+_jwt_cache = TTLCache(maxsize=10000, ttl=30)
+_jwt_cache_lock = threading.Lock()
+
 def generate_token(user_id):
+    now = int(time.time())
     payload = {
         'user_id': str(user_id),
-        'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=24),
-        'iat': datetime.datetime.utcnow()
+        'exp': now + TOKEN_LIFETIME,
+        'iat': now
     }
     return jwt.encode(payload, app.config['JWT_SECRET_KEY'], algorithm='HS256')
 
 def verify_token(token):
+    # Cache hits skip the HMAC check + JSON decode; only the token's hash is kept
+    key = hashlib.sha256(token.encode()).digest()
+    with _jwt_cache_lock:
+        cached = _jwt_cache.get(key)
+    if cached and cached[1] > time.time():
+        return cached[0]
     try:
         payload = jwt.decode(token, app.config['JWT_SECRET_KEY'], algorithms=['HS256'])
-        return payload['user_id']
     except jwt.ExpiredSignatureError:
         return None
     except jwt.InvalidTokenError:
         return None
+    with _jwt_cache_lock:
+        _jwt_cache[key] = (payload['user_id'], payload['exp'])
+    return payload['user_id']
+
+def request_user_id():
+    """user_id from this request's Authorization header; parsed and verified once per request."""
+    if 'user_id' not in g:
+        token = request.headers.get('Authorization')
+        if token and token.startswith('Bearer '):
+            token = token[7:]
+        g.user_id = verify_token(token) if token else None
+    return g.user_id
 
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = request.headers.get('Authorization')
-        if not token:
+        if not request.headers.get('Authorization'):
             return jsonify({'message': 'Token is missing!'}), 401
-        if token.startswith('Bearer '):
-            token = token[7:]
-        user_id = verify_token(token)
+        user_id = request_user_id()
         if not user_id:
             return jsonify({'message': 'Token is invalid!'}), 401
         return f(user_id, *args, **kwargs)
     return decorated
 
 # -------------------------
-# Routes (adapted to file storage)
+# Response cache for aggregate endpoints
+# -------------------------
+RESPONSE_CACHE_TTL = 30  # seconds; also bounds staleness of "today"-relative windows
+_response_cache = {}  # request.path -> (entries_version, stored_at, body, etag)
+_response_cache_lock = threading.Lock()
+
+def cached_json(f):
+    """Serve a GET JSON route from memory until entries change, with an ETag for clients."""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        key = request.path  # these routes take no query args, so the key space stays bounded
+        version = entries_version()
+        now = time.time()
+        with _response_cache_lock:
+            hit = _response_cache.get(key)
+        if hit and hit[0] == version and now - hit[1] < RESPONSE_CACHE_TTL:
+            body, etag = hit[2], hit[3]
+        else:
+            response = make_response(f(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            body = response.get_data()
+            etag = f"{version}-{hashlib.sha1(body).hexdigest()[:16]}"
+            with _response_cache_lock:
+                _response_cache[key] = (version, now, body, etag)
+        response = Response(body, mimetype='application/json')
+        response.set_etag(etag)
+        # revalidate every time (answered with a 304 when nothing changed) rather than
+        # max-age, so the dashboard never shows stale counts right after a new entry
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response.make_conditional(request)
+    return decorated
+
+# -------------------------
+# Password helpers
+# -------------------------
+BCRYPT_ROUNDS = 12  # bcrypt only runs on /register and /login; other routes use the JWT
+
+def hash_password(password):
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode()
+
+# A full modular-crypt bcrypt hash; a legacy plain-text password may still start with "$2"
+_BCRYPT_RE = re.compile(r"\$2[abxy]\$(\d\d)\$[./A-Za-z0-9]{53}")
+
+def password_needs_rehash(stored):
+    """True for plain-text rows and hashes made with fewer than BCRYPT_ROUNDS rounds."""
+    match = _BCRYPT_RE.fullmatch(stored)
+    return match is None or int(match.group(1)) < BCRYPT_ROUNDS
+
+def check_password(password, stored):
+    if _BCRYPT_RE.fullmatch(stored):
+        return bcrypt.checkpw(password.encode(), stored.encode())
+    # plain-text password from a row created before hashing; still compare in constant time
+    return hmac.compare_digest(password.encode(), stored.encode())
+
+# -------------------------
+# Routes
 # -------------------------
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+MAX_BULK_ENTRIES = 500
+
 @app.route('/login', methods=['GET', 'POST'])
 def login():
     if request.method == 'GET':
@@ -147,17 +587,22 @@ def login():
 
     if not username or not password:
         return jsonify({'message': 'Username and password are required!'}), 400
+    # before find_user: sqlite3 can't bind dicts/lists, and bcrypt needs str
+    if not all(isinstance(value, str) for value in (username, password)):
+        return jsonify({'message': 'Username and password must be strings!'}), 400
 
     # find user by username or email
-    users = find_users(lambda u: u.get('username') == username or u.get('email') == username)
-    user = users[0] if users else None
+    user = find_user(username=username, email=username)
 
     if not user:
         return jsonify({'message': 'Invalid username or password!'}), 401
 
-    # NOTE: currently stored as plain text in this demo; better to hash with bcrypt
-    if 'password' in user and user['password'] != password:
+    stored_password = user.get('password') or ''
+    if not check_password(password, stored_password):
         return jsonify({'message': 'Invalid username or password!'}), 401
+    if password_needs_rehash(stored_password):
+        # upgrade legacy/weaker hashes while we hold the plain-text password
+        update_user_password(user['id'], hash_password(password))
 
     token = generate_token(user['id'])
 
@@ -184,18 +629,20 @@ def register():
 
     if not username or not email or not password:
         return jsonify({'message': 'Username, email, and password are required!'}), 400
+    if not all(isinstance(value, str) for value in (username, email, password)):
+        return jsonify({'message': 'Username, email, and password must be strings!'}), 400
 
     # check existing user
-    existing = find_users(lambda u: u.get('username') == username or u.get('email') == email)
+    existing = find_user(username=username, email=email)
     if existing:
         return jsonify({'message': 'Username or email already exists!'}), 409
 
     new_user = {
-        'id': str(uuid4()),
+        'id': fast_uuid4(),
         'username': username,
         'email': email,
-        'password': password,  # in prod: store bcrypt.hashpw(...)
-        'created_at': datetime.datetime.utcnow().isoformat()
+        'password': hash_password(password),
+        'created_at': utc_now_iso()
     }
     insert_user(new_user)
 
@@ -218,15 +665,18 @@ def settings():
 
 @app.route('/get_entries')
 def get_entries():
-    entries = find_entries()
-    # sort by created_at descending (if present) else insertion order reversed
     try:
-        entries_sorted = sorted(entries, key=lambda e: e.get('created_at', ''), reverse=True)
-    except Exception:
-        entries_sorted = list(reversed(entries))
-    # remove internal fields if any and return
-    out = [{"date": e.get("date"), "entry": e.get("entry"), "id": e.get("id")} for e in entries_sorted]
-    return jsonify({"entries": out})
+        limit = min(int(request.args.get('limit', DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({"message": "limit must be an integer"}), 400
+    if limit < 1:
+        return jsonify({"message": "limit must be positive"}), 400
+    entries = list_entries(limit, request.args.get('before'))
+    if entries is None:
+        return jsonify({"message": "before must be the id of an existing entry"}), 400
+    # a full page means there may be more; the client passes this id back as ?before=
+    next_before = entries[-1]["id"] if len(entries) == limit else None
+    return jsonify({"entries": entries, "next_before": next_before})
 
 @app.route('/add_entry', methods=['POST'])
 def add_entry():
@@ -245,40 +695,85 @@ def add_entry():
     if not entry_text:
         app.logger.warning("add_entry: no 'entry' found in request")
         return jsonify({"message": "No entry provided"}), 400
+    if not isinstance(entry_text, str):
+        return jsonify({"message": "'entry' must be a string"}), 400
 
-    date = datetime.date.today()
-    date_str = date.strftime("%A, %Y-%m-%d")
+    date, date_str = today_and_display_date()
     new_entry = {
-        "id": str(uuid4()),
+        "id": fast_uuid4(),
         "date": date_str,
         "entry": entry_text,
-        "created_at": datetime.datetime.utcnow().isoformat()
+        "created_at": utc_now_iso(),
+        "entry_date": date.isoformat(),
+        "token_count": token_count(entry_text)
     }
+    new_entry.update(score_entry(entry_text))
     try:
         insert_entry(new_entry)
     except Exception as e:
         app.logger.exception("Error inserting entry")
         return jsonify({"error": "Error adding entry", "detail": str(e)}), 500
 
-    entries = find_entries()
-    # return sorted entries (descending)
+    # Return only the new entry (O(1) in history size); the client adds it to its list
+    return jsonify({
+        "message": "Entry added successfully!",
+        "id": new_entry["id"],
+        "entry": {"date": new_entry["date"], "entry": new_entry["entry"], "id": new_entry["id"]}
+    }), 201
+
+@app.route('/bulk_add', methods=['POST'])
+def bulk_add():
+    # JSON array of strings or {"entry": ..., "entry_date": "YYYY-MM-DD"} objects
+    items = request.get_json(silent=True)
+    if not isinstance(items, list) or not items:
+        return jsonify({"message": "Expected a non-empty JSON array of entries"}), 400
+    if len(items) > MAX_BULK_ENTRIES:
+        return jsonify({"message": f"At most {MAX_BULK_ENTRIES} entries per request"}), 400
+
+    now = utc_now()
+    today = datetime.date.today()
+    new_entries = []
+    for i, item in enumerate(items):
+        if isinstance(item, str):
+            item = {"entry": item}
+        entry_text = item.get("entry") if isinstance(item, dict) else None
+        if not isinstance(entry_text, str) or not entry_text:
+            return jsonify({"message": "Every item needs a non-empty string 'entry'"}), 400
+        try:
+            date = datetime.date.fromisoformat(item["entry_date"]) if item.get("entry_date") else datetime.date.today()
+        except (TypeError, ValueError):
+            return jsonify({"message": f"Invalid entry_date: {item.get('entry_date')!r}"}), 400
+        # created_at increases by 1 µs per item so the batch lists in the order it was sent;
+        # back-dated items are stamped on their own day so they don't show up as the newest
+        base = datetime.datetime.combine(date, datetime.time()) if date < today else now
+        created_at = (base + timedelta(microseconds=i)).isoformat(timespec='microseconds')
+        new_entries.append({
+            "id": fast_uuid4(),
+            "date": date.strftime("%A, %Y-%m-%d"),
+            "entry": entry_text,
+            "created_at": created_at,
+            "entry_date": date.isoformat(),
+            "token_count": token_count(entry_text)
+        })
+    for new_entry in new_entries:
+        new_entry.update(score_entry(new_entry["entry"]))
     try:
-        entries_sorted = sorted(entries, key=lambda e: e.get('created_at', ''), reverse=True)
-    except Exception:
-        entries_sorted = list(reversed(entries))
-    out = [{"date": e.get("date"), "entry": e.get("entry"), "id": e.get("id")} for e in entries_sorted]
-    return jsonify({"message": "Entry added successfully!", "entries": out}), 201
+        insert_entries(new_entries)
+    except Exception as e:
+        app.logger.exception("Error inserting entries")
+        return jsonify({"error": "Error adding entries", "detail": str(e)}), 500
+    return jsonify({"message": f"{len(new_entries)} entries added", "ids": [e["id"] for e in new_entries]}), 201
 
 @app.route('/get_sentiment', methods=['GET'])
+@cached_json
 def get_sentiment():
     if not ensure_sia():
         return jsonify({"error": "Sentiment model not available. Contact admin."}), 503
 
-    entries = find_entries()
-    if not entries:
+    # Token-weighted mean of the stored per-entry scores; no re-scoring of the whole history
+    sentiment_score = weighted_entry_scores()
+    if sentiment_score is None:
         return jsonify({"message": "No entries available for sentiment analysis."})
-    all_entries = " ".join([entry.get('entry', '') for entry in entries])
-    sentiment_score = sia.polarity_scores(all_entries)
     return jsonify({"sentiment": sentiment_score})
 
 @app.route('/get_comprehensive_analysis', methods=['POST'])
@@ -287,25 +782,26 @@ def get_comprehensive_analysis():
         return jsonify({"error": "Sentiment model not available. Contact admin."}), 503
 
     entry_text = request.form.get('entry') or (request.get_json(silent=True) or {}).get('entry')
-    if not entry_text:
+    if entry_text and not isinstance(entry_text, str):
+        return jsonify({"message": "'entry' must be a string"}), 400
+    if not entry_text or entry_text.isspace():
         return jsonify({"message": "No entry provided for analysis."})
     try:
-        sentiment_score = sia.polarity_scores(entry_text)
+        sentiment_score = score_entry(entry_text)
+        text_lower, tokens = _preprocess(entry_text)
+        # Every keyword is made of letters, so text without a single word can't match any
+        hits = _scan(text_lower) if tokens else _NO_HITS
         overall_sentiment = get_sentiment_category(sentiment_score['compound'])
         intensity = get_sentiment_intensity(sentiment_score['compound'])
         try:
-            emotions = get_custom_emotion(entry_text)
-            emotion_keys = ['Happy', 'Angry', 'Surprise', 'Sad', 'Fear']
-            for key in emotion_keys:
-                if key not in emotions:
-                    emotions[key] = 0
+            emotions, dominant, dominant_pct = get_custom_emotion(tokens)
         except Exception:
-            emotions = {"Happy": 0, "Angry": 0, "Surprise": 0, "Sad": 0, "Fear": 0}
+            emotions, dominant, dominant_pct = {"Happy": 0, "Angry": 0, "Surprise": 0, "Sad": 0, "Fear": 0}, None, 0
         highlights = extract_highlights(entry_text)
-        mental_patterns = identify_mental_patterns(entry_text)
-        strengths = identify_strengths(entry_text)
-        suggestions = generate_suggestions(sentiment_score['compound'], emotions, mental_patterns)
-        summary = generate_summary(sentiment_score['compound'], emotions)
+        mental_patterns = identify_mental_patterns(hits)
+        strengths = identify_strengths(hits)
+        suggestions = generate_suggestions(sentiment_score['compound'], dominant, dominant_pct, mental_patterns)
+        summary = generate_summary(sentiment_score['compound'], dominant, dominant_pct)
         trend_insight = "Not enough data for trend analysis yet."
         return jsonify({
             "overall_sentiment": {"category": overall_sentiment, "intensity": intensity},
@@ -329,114 +825,62 @@ def get_current_entry_sentiment():
     entry_text = request.form.get('entry') or (request.get_json(silent=True) or {}).get('entry')
     if not entry_text:
         return jsonify({"message": "No entry provided for sentiment analysis."}), 400
-    sentiment_score = sia.polarity_scores(entry_text)
+    if not isinstance(entry_text, str):
+        return jsonify({"message": "'entry' must be a string"}), 400
+    sentiment_score = score_entry(entry_text)
     return jsonify({"sentiment": sentiment_score})
 
 @app.route('/get_daily_sentiment', methods=['GET'])
+@cached_json
 def get_daily_sentiment():
     if not ensure_sia():
         return jsonify({"error": "Sentiment model not available. Contact admin."}), 503
 
-    today = datetime.date.today()
-    today_str = today.strftime("%A, %Y-%m-%d")
-    entries = find_entries(lambda e: e.get('date') == today_str)
+    today, today_str = today_and_display_date()
+    entries = find_entries_on(today_str)
     if not entries:
         return jsonify({"message": "No entries available for today."})
     all_entries = " ".join([entry.get('entry', '') for entry in entries])
-    sentiment_score = sia.polarity_scores(all_entries)
+    sentiment_score = get_sia().polarity_scores(all_entries)
     return jsonify({"sentiment": sentiment_score, "period": "daily"})
 
-@app.route('/get_weekly_sentiment', methods=['GET'])
-def get_weekly_sentiment():
+# Named periods keep the original response labels/messages for the dashboard's routes
+PERIODS = {7: ("weekly", "the past week"), 30: ("monthly", "the past month")}
+MAX_PERIOD_DAYS = 366
+
+@app.route('/get_period_sentiment/<int:days>', methods=['GET'])
+@cached_json
+def get_period_sentiment(days):
     if not ensure_sia():
         return jsonify({"error": "Sentiment model not available. Contact admin."}), 503
+    if not 1 <= days <= MAX_PERIOD_DAYS:
+        return jsonify({"message": f"days must be between 1 and {MAX_PERIOD_DAYS}"}), 400
 
+    period, description = PERIODS.get(days, (f"{days}_days", f"the past {days} days"))
     today = datetime.date.today()
-    week_ago = today - timedelta(days=7)
-    entries = find_entries()
-    filtered_entries = []
-    for entry in entries:
-        try:
-            entry_date_str = entry.get('date', '').split(", ")[1]
-            entry_date = datetime.datetime.strptime(entry_date_str, "%Y-%m-%d").date()
-            if week_ago <= entry_date <= today:
-                filtered_entries.append(entry)
-        except Exception:
-            pass
-    if not filtered_entries:
-        return jsonify({"message": "No entries available for the past week."})
-    daily_sentiments = {}
-    for entry in filtered_entries:
-        try:
-            entry_date_str = entry.get('date', '').split(", ")[1]
-            sentiment_score = sia.polarity_scores(entry.get('entry', ''))
-            daily_sentiments.setdefault(entry_date_str, []).append(sentiment_score['compound'])
-        except Exception:
-            pass
-    daily_averages = {date: (sum(scores) / len(scores) if scores else 0) for date, scores in daily_sentiments.items()}
-    all_entries = " ".join([entry.get('entry', '') for entry in filtered_entries])
-    sentiment_score = sia.polarity_scores(all_entries)
-    return jsonify({"sentiment": sentiment_score, "period": "weekly", "daily_data": daily_averages})
+    lo, hi = (today - timedelta(days=days)).isoformat(), today.isoformat()
+    daily_averages = daily_compound_averages(lo, hi)
+    if not daily_averages:
+        return jsonify({"message": f"No entries available for {description}."})
+    # weighted mean of the stored scores, like /get_sentiment: no re-scoring of the period's text
+    sentiment_score = weighted_entry_scores(lo, hi) or dict(zip(SCORE_KEYS, _BLANK_SCORES))
+    return jsonify({"sentiment": sentiment_score, "period": period, "daily_data": daily_averages})
+
+@app.route('/get_weekly_sentiment', methods=['GET'])
+def get_weekly_sentiment():
+    return get_period_sentiment(7)
 
 @app.route('/get_monthly_sentiment', methods=['GET'])
 def get_monthly_sentiment():
-    if not ensure_sia():
-        return jsonify({"error": "Sentiment model not available. Contact admin."}), 503
-
-    today = datetime.date.today()
-    month_ago = today - timedelta(days=30)
-    entries = find_entries()
-    filtered_entries = []
-    for entry in entries:
-        try:
-            entry_date_str = entry.get('date', '').split(", ")[1]
-            entry_date = datetime.datetime.strptime(entry_date_str, "%Y-%m-%d").date()
-            if month_ago <= entry_date <= today:
-                filtered_entries.append(entry)
-        except Exception:
-            pass
-    if not filtered_entries:
-        return jsonify({"message": "No entries available for the past month."})
-    daily_sentiments = {}
-    for entry in filtered_entries:
-        try:
-            entry_date_str = entry.get('date', '').split(", ")[1]
-            sentiment_score = sia.polarity_scores(entry.get('entry', ''))
-            daily_sentiments.setdefault(entry_date_str, []).append(sentiment_score['compound'])
-        except Exception:
-            pass
-    daily_averages = {date: (sum(scores) / len(scores) if scores else 0) for date, scores in daily_sentiments.items()}
-    all_entries = " ".join([entry.get('entry', '') for entry in filtered_entries])
-    sentiment_score = sia.polarity_scores(all_entries)
-    return jsonify({"sentiment": sentiment_score, "period": "monthly", "daily_data": daily_averages})
+    return get_period_sentiment(30)
 
 @app.route('/get_sentiment_counts', methods=['GET'])
+@cached_json
 def get_sentiment_counts():
     if not ensure_sia():
         return jsonify({"error": "Sentiment model not available. Contact admin."}), 503
 
-    entries = find_entries()
-    if not entries:
-        return jsonify({"counts": {"happy": 0, "neutral": 0, "sad": 0}})
-    happy_count = 0
-    neutral_count = 0
-    sad_count = 0
-    for entry in entries:
-        try:
-            sentiment_score = sia.polarity_scores(entry.get('entry', ''))
-            compound = sentiment_score['compound']
-            if compound >= 0.5:
-                happy_count += 1
-            elif compound > 0:
-                happy_count += 1
-            elif compound == 0:
-                neutral_count += 1
-            elif compound > -0.5:
-                sad_count += 1
-            else:
-                sad_count += 1
-        except Exception:
-            pass
+    happy_count, neutral_count, sad_count = count_entries_by_sentiment()
     return jsonify({"counts": {"happy": happy_count, "neutral": neutral_count, "sad": sad_count}})
 
 @app.route('/clear_entries', methods=['POST'])
@@ -444,94 +888,126 @@ def clear_entries():
     delete_all_entries()
     return jsonify({"message": "Diary entries cleared!"})
 
+@app.route('/health', methods=['GET'])
+def health():
+    try:
+        get_db().execute("SELECT 1").fetchone()
+    except sqlite3.Error:
+        app.logger.exception("Health check: database unavailable")
+        return jsonify({"status": "error", "database": "unavailable"}), 503
+    return jsonify({"status": "ok", "database": "ok", "sentiment_model": ensure_sia()})
+
+# -------------------------
+# Keyword tables
+# -------------------------
+# Pattern and strength keywords are stems/phrases, matched as substrings of the lowercased text
+MENTAL_PATTERN_KEYWORDS = {
+    'Stress': ['stress', 'stressed', 'pressure', 'overwhelm', 'anxious', 'anxiety'],
+    'Overthinking': ['think', 'thinking', 'thought', 'wonder', 'wondering', 'contemplate'],
+    'Motivation': ['motivat', 'inspir', 'excit', 'enthusias', 'eager', 'drive'],
+    'Avoidance': ['avoid', 'procrastin', 'delay', 'postpone'],
+    'Self-criticism': ['should have', 'could have', 'would have', 'mistake', 'wrong', 'fail'],
+    'Confidence': ['confident', 'proud', 'accomplish', 'success', 'achiev'],
+    'Relationship concerns': ['friend', 'family', 'relationship', 'partner', 'love', 'alone'],
+    'Fatigue': ['tired', 'exhaust', 'fatigue', 'sleepy', 'drain'],
+    'Productivity': ['productiv', 'efficien', 'focus', 'concentrat', 'work'],
+}
+
+STRENGTH_KEYWORDS = {
+    'Effort': ['try', 'attempt', 'work', 'effort', 'strive'],
+    'Honesty': ['honest', 'truth', 'admit', 'confess'],
+    'Resilience': ['persever', 'persist', 'resilien', 'bounc', 'recover'],
+    'Discipline': ['disciplin', 'routine', 'habit', 'schedule', 'plan'],
+    'Responsibility': ['responsib', 'duty', 'obligat', 'accountab'],
+    'Empathy': ['empath', 'understand', 'feel for', 'compassion'],
+    'Self-awareness': ['realize', 'recognize', 'aware', 'understand myself'],
+}
+
+# Emotion words are matched as whole words against the text's token set
+EMOTION_KEYWORDS = {
+    'Happy': ['happy', 'joy', 'glad', 'pleased', 'delighted', 'cheerful', 'content', 'satisfied', 'excited', 'love', 'enjoy', 'fun', 'celebrate'],
+    'Angry': ['angry', 'mad', 'furious', 'annoyed', 'frustrated', 'irritated', 'hate', 'dislike', 'rage'],
+    'Surprise': ['surprise', 'amazed', 'astonished', 'shocked', 'stunned', 'startled', 'unexpected', 'incredible'],
+    'Sad': ['sad', 'unhappy', 'depressed', 'gloomy', 'melancholy', 'down', 'blue', 'upset', 'disappointed', 'lonely'],
+    'Fear': ['fear', 'afraid', 'scared', 'frightened', 'anxious', 'worried', 'nervous', 'panic', 'dread'],
+}
+# Tokenize once, then intersect with each set. A single alternation regex over all emotion
+# words (even with \b anchors) benchmarked ~2x slower than this on CPython's re engine.
+_EMOTION_SETS = {name: frozenset(words) for name, words in EMOTION_KEYWORDS.items()}
+_TOKEN_RE = re.compile(r"[a-z]+")
+
+def _build_keyword_automaton():
+    """One Aho-Corasick automaton tagging every keyword with its (bucket, category)."""
+    tags = {}
+    for bucket, table in (("pattern", MENTAL_PATTERN_KEYWORDS),
+                          ("strength", STRENGTH_KEYWORDS)):
+        for category, keywords in table.items():
+            for keyword in keywords:
+                tags.setdefault(keyword, []).append((bucket, category, keyword))
+    automaton = ahocorasick.Automaton()
+    for keyword, keyword_tags in tags.items():
+        automaton.add_word(keyword, tuple(keyword_tags))
+    automaton.make_automaton()
+    return automaton
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton()
+
+# Runs of text between sentence terminators, starting at the first non-space character;
+# runs that can't reach 11 characters are skipped by the regex engine, never stripped
+_SENT_RE = re.compile(r'[^.!?\s][^.!?]{10,}')
+
+def _preprocess(text):
+    """Lowercase and tokenize once; every analysis helper works from this pair."""
+    text_lower = text.lower()
+    return text_lower, frozenset(_TOKEN_RE.findall(text_lower))
+
+def _scan(text_lower):
+    """Single pass over the text; returns {bucket: Counter(category -> distinct keywords hit)}."""
+    found = set()
+    for _, keyword_tags in _KEYWORD_AUTOMATON.iter(text_lower):
+        found.update(keyword_tags)
+    hits = {"pattern": Counter(), "strength": Counter()}
+    for bucket, category, _ in found:
+        hits[bucket][category] += 1
+    return hits
+
+_NO_HITS = {"pattern": Counter(), "strength": Counter()}
+
 # -------------------------
 # Helper functions
 # -------------------------
+# Lookup tables indexed by summing threshold comparisons (bools are 0/1)
+_CATEGORIES = ("Negative", "Neutral", "Positive")
+_INTENSITIES = ("Mild", "Moderate", "Strong")
+_SUMMARIES = ("A generally {sentiment} entry with mixed emotional tones.",
+              "A {sentiment} entry dominated by {emotion} emotions.")
+
 def get_sentiment_category(compound):
-    if compound >= 0.05:
-        return "Positive"
-    elif compound <= -0.05:
-        return "Negative"
-    else:
-        return "Neutral"
+    # <= -0.05 -> 0, (-0.05, 0.05) -> 1, >= 0.05 -> 2
+    return _CATEGORIES[(compound > -0.05) + (compound >= 0.05)]
 
 def get_sentiment_intensity(compound):
     abs_compound = abs(compound)
-    if abs_compound >= 0.5:
-        return "Strong"
-    elif abs_compound >= 0.1:
-        return "Moderate"
-    else:
-        return "Mild"
+    return _INTENSITIES[(abs_compound >= 0.1) + (abs_compound >= 0.5)]
 
 def extract_highlights(text):
-    sentences = re.split(r'[.!?]+', text)
+    # Up to 7 sentences longer than 10 characters, in order
     highlights = []
-    for sentence in sentences:
-        sentence = sentence.strip()
+    for match in _SENT_RE.finditer(text):
+        sentence = match.group().rstrip()
         if len(sentence) > 10:
             highlights.append(sentence)
-    return highlights[:7] if len(highlights) > 7 else highlights[3:] if len(highlights) < 3 else highlights
+            if len(highlights) == 7:
+                break
+    return highlights
 
-def identify_mental_patterns(text):
-    patterns = []
-    text_lower = text.lower()
-    stress_keywords = ['stress', 'stressed', 'pressure', 'overwhelm', 'anxious', 'anxiety']
-    if any(keyword in text_lower for keyword in stress_keywords):
-        patterns.append('Stress')
-    overthinking_keywords = ['think', 'thinking', 'thought', 'wonder', 'wondering', 'contemplate']
-    if text_lower.count('think') > 3 or any(keyword in text_lower for keyword in overthinking_keywords):
-        patterns.append('Overthinking')
-    motivation_keywords = ['motivat', 'inspir', 'excit', 'enthusias', 'eager', 'drive']
-    if any(keyword in text_lower for keyword in motivation_keywords):
-        patterns.append('Motivation')
-    avoidance_keywords = ['avoid', 'procrastin', 'delay', 'postpone']
-    if any(keyword in text_lower for keyword in avoidance_keywords):
-        patterns.append('Avoidance')
-    self_criticism_keywords = ['should have', 'could have', 'would have', 'mistake', 'wrong', 'fail']
-    if any(keyword in text_lower for keyword in self_criticism_keywords):
-        patterns.append('Self-criticism')
-    confidence_keywords = ['confident', 'proud', 'accomplish', 'success', 'achiev']
-    if any(keyword in text_lower for keyword in confidence_keywords):
-        patterns.append('Confidence')
-    relationship_keywords = ['friend', 'family', 'relationship', 'partner', 'love', 'alone']
-    if any(keyword in text_lower for keyword in relationship_keywords):
-        patterns.append('Relationship concerns')
-    fatigue_keywords = ['tired', 'exhaust', 'fatigue', 'sleepy', 'drain']
-    if any(keyword in text_lower for keyword in fatigue_keywords):
-        patterns.append('Fatigue')
-    productivity_keywords = ['productiv', 'efficien', 'focus', 'concentrat', 'work']
-    if any(keyword in text_lower for keyword in productivity_keywords):
-        patterns.append('Productivity')
-    return patterns
-
-def identify_strengths(text):
-    strengths = []
-    text_lower = text.lower()
-    effort_keywords = ['try', 'attempt', 'work', 'effort', 'strive']
-    if any(keyword in text_lower for keyword in effort_keywords):
-        strengths.append('Effort')
-    honesty_keywords = ['honest', 'truth', 'admit', 'confess']
-    if any(keyword in text_lower for keyword in honesty_keywords):
-        strengths.append('Honesty')
-    resilience_keywords = ['persever', 'persist', 'resilien', 'bounc', 'recover']
-    if any(keyword in text_lower for keyword in resilience_keywords):
-        strengths.append('Resilience')
-    discipline_keywords = ['disciplin', 'routine', 'habit', 'schedule', 'plan']
-    if any(keyword in text_lower for keyword in discipline_keywords):
-        strengths.append('Discipline')
-    responsibility_keywords = ['responsib', 'duty', 'obligat', 'accountab']
-    if any(keyword in text_lower for keyword in responsibility_keywords):
-        strengths.append('Responsibility')
-    empathy_keywords = ['empath', 'understand', 'feel for', 'compassion']
-    if any(keyword in text_lower for keyword in empathy_keywords):
-        strengths.append('Empathy')
-    self_awareness_keywords = ['realize', 'recognize', 'aware', 'understand myself']
-    if any(keyword in text_lower for keyword in self_awareness_keywords):
-        strengths.append('Self-awareness')
-    return strengths
-
-def generate_suggestions(compound, emotions, mental_patterns):
+def identify_mental_patterns(hits):
+    return [name for name in MENTAL_PATTERN_KEYWORDS if hits["pattern"][name]]
+
+def identify_strengths(hits):
+    return [name for name in STRENGTH_KEYWORDS if hits["strength"][name]]
+
+def generate_suggestions(compound, dominant_emotion, dominant_pct, mental_patterns):
     suggestions = []
     if compound < -0.3:
         suggestions.append("It seems like you're going through a tough time. Remember that difficult moments are temporary, and you've overcome challenges before.")
@@ -539,13 +1015,12 @@ def generate_suggestions(compound, emotions, mental_patterns):
         suggestions.append("You're in a positive headspace right now - that's wonderful! Consider what's contributing to this positivity and how you can cultivate more of it.")
     else:
         suggestions.append("You're in a balanced state of mind. This stability can be a great foundation for growth and self-reflection.")
-    dominant_emotion = max(emotions, key=emotions.get) if emotions else "Happy"
-    if emotions and emotions.get(dominant_emotion, 0) > 30:
+    if dominant_pct > 30:
         if dominant_emotion == 'Happy':
             suggestions.append("Your joy is contagious! Share this positive energy with someone you care about today.")
         elif dominant_emotion == 'Sad':
             suggestions.append("It's okay to feel sad sometimes. Be gentle with yourself and engage in activities that bring you comfort.")
-        elif dominant_emotion == 'Anger':
+        elif dominant_emotion == 'Angry':
             suggestions.append("Anger is a natural emotion. Try channeling this energy into something constructive, like exercise or creative expression.")
         elif dominant_emotion == 'Fear':
             suggestions.append("Fear can be protective, but don't let it hold you back. Take small steps toward what scares you.")
@@ -561,43 +1036,51 @@ def generate_suggestions(compound, emotions, mental_patterns):
         suggestions.append("Avoidance is a common coping mechanism. Try breaking overwhelming tasks into smaller, manageable steps.")
     return suggestions if suggestions else ["You're doing great. Keep taking care of yourself and your emotional well-being."]
 
-def generate_summary(compound, emotions):
+def generate_summary(compound, dominant_emotion, dominant_pct):
     sentiment_word = get_sentiment_category(compound)
-    dominant_emotion = max(emotions, key=emotions.get) if emotions else "Happy"
-    emotion_percentage = emotions.get(dominant_emotion, 0) if emotions else 0
-    if emotion_percentage > 50:
-        return f"A {sentiment_word.lower()} entry dominated by {dominant_emotion.lower()} emotions."
-    else:
-        return f"A generally {sentiment_word.lower()} entry with mixed emotional tones."
+    return _SUMMARIES[dominant_pct > 50].format(sentiment=sentiment_word.lower(),
+                                                emotion=(dominant_emotion or "").lower())
 
-def get_custom_emotion(text):
+def get_custom_emotion(tokens):
+    """(percentages per emotion, dominant emotion or None if no emotion words, its percentage)."""
     emotions = {"Happy": 0, "Angry": 0, "Surprise": 0, "Sad": 0, "Fear": 0}
-    text_lower = text.lower()
-    happy_keywords = ['happy','joy','glad','pleased','delighted','cheerful','content','satisfied','excited','love','enjoy','fun','celebrate']
-    angry_keywords = ['angry','mad','furious','annoyed','frustrated','irritated','hate','dislike','rage']
-    surprise_keywords = ['surprise','amazed','astonished','shocked','stunned','startled','unexpected','incredible']
-    sad_keywords = ['sad','unhappy','depressed','gloomy','melancholy','down','blue','upset','disappointed','lonely']
-    fear_keywords = ['fear','afraid','scared','frightened','anxious','worried','nervous','panic','dread']
-    happy_count = sum(1 for word in happy_keywords if word in text_lower)
-    angry_count = sum(1 for word in angry_keywords if word in text_lower)
-    surprise_count = sum(1 for word in surprise_keywords if word in text_lower)
-    sad_count = sum(1 for word in sad_keywords if word in text_lower)
-    fear_count = sum(1 for word in fear_keywords if word in text_lower)
-    total_emotion_words = happy_count + angry_count + surprise_count + sad_count + fear_count
-    if total_emotion_words > 0:
-        emotions["Happy"] = round((happy_count / total_emotion_words) * 100)
-        emotions["Angry"] = round((angry_count / total_emotion_words) * 100)
-        emotions["Surprise"] = round((surprise_count / total_emotion_words) * 100)
-        emotions["Sad"] = round((sad_count / total_emotion_words) * 100)
-        emotions["Fear"] = round((fear_count / total_emotion_words) * 100)
-    return emotions
+    if not tokens:
+        return emotions, None, 0
+    # one pass collects the counts, their total and the first-listed maximum
+    counts = {}
+    total_emotion_words = 0
+    dominant, dominant_count = None, 0
+    for name, words in _EMOTION_SETS.items():
+        count = counts[name] = len(tokens & words)
+        total_emotion_words += count
+        if count > dominant_count:
+            dominant, dominant_count = name, count
+    if not total_emotion_words:
+        return emotions, None, 0
+    for name in emotions:
+        emotions[name] = round((counts[name] / total_emotion_words) * 100)
+    return emotions, dominant, emotions[dominant]
+
+# -------------------------
+# Warm-up
+# -------------------------
+def warm_up():
+    """Pay lazy initialization cost at import (in the gunicorn master when preloading)."""
+    try:
+        get_sia().polarity_scores("warmup")  # lexicon/emoji tables, regex compilation
+        jwt.decode(jwt.encode({"warmup": 1}, app.config['JWT_SECRET_KEY'], algorithm='HS256'),
+                   app.config['JWT_SECRET_KEY'], algorithms=['HS256'])
+    except Exception:
+        app.logger.exception("Warm-up failed; initializing on first request instead")
+
+warm_up()
 
 # -------------------------
 # Run
 # -------------------------
 if __name__ == '__main__':
-    # Ensure data file exists on startup
-    load_data()
+    # Ensure the database exists on startup
+    init_db()
 
     # Local dev run
     app.run(host='0.0.0.0', port=int(os.environ.get("PORT", 5000)), debug=(os.environ.get("FLASK_DEBUG", "false").lower() == "true"))
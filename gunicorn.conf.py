@@ -0,0 +1,32 @@
+# gunicorn.conf.py - production server settings; run with: gunicorn app:app
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+
+# One process per core for the CPU-bound VADER/keyword work, plus a thread pool per
+# process so requests waiting on SQLite don't hold the whole worker
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+timeout = 30
+keepalive = 5
+
+# Import (and warm up) the app once in the master; workers are forked with the VADER
+# lexicon and keyword automaton already loaded and share those pages copy-on-write
+preload_app = True
+
+
+def when_ready(server):
+    # Schema, migrations and the legacy import run once here, before any worker forks;
+    # the master's connection is closed again so no SQLite handle crosses fork()
+    from app import close_db, init_db
+    init_db()
+    close_db()
+
+
+def post_worker_init(worker):
+    # Open this worker's own connection before it accepts traffic, so the first request
+    # doesn't pay for it (and run init_db if the app wasn't preloaded)
+    from app import get_db
+    get_db()
@@ -127,7 +127,7 @@ const suggestions = {
     
     $.post("/add_entry", { entry: entry }, (response) => {
         $("#diaryEntry").val("");
-        updateEntryHistory(response.entries);
+        addEntryToHistory(response.entry);
         showToast("Entry added successfully!", "success");
         updateDashboard();
         $("#sentimentResult").html(`
@@ -165,16 +165,49 @@ const suggestions = {
     entryHistory.empty();
   
     entries.forEach((e) => {
-        const entryItem = $(
-            `<div class="entry-item fade-in">
-                <div class="entry-date"><i class="fas fa-calendar me-1"></i>${e.date}</div>
-                <p>${e.entry}</p>
-            </div>`
-        );
-        entryHistory.prepend(entryItem);
+        entryHistory.prepend(renderEntryItem(e));
     });
   }
   
+  function loadEntries(before) {
+    // /get_entries is paged newest first; older pages go above what is already shown
+    $.get("/get_entries", before ? { before: before } : {}, (response) => {
+        if (before) {
+            $("#loadOlderEntries").remove();
+            response.entries.forEach((e) => {
+                $("#entryHistory").prepend(renderEntryItem(e));
+            });
+        } else {
+            updateEntryHistory(response.entries);
+        }
+        if (response.next_before) {
+            const loadOlder = $(
+                `<button id="loadOlderEntries" class="btn btn-outline-secondary btn-sm w-100 mb-3">
+                    <i class="fas fa-history me-1"></i>Load older entries
+                </button>`
+            );
+            loadOlder.on("click", () => loadEntries(response.next_before));
+            $("#entryHistory").prepend(loadOlder);
+        }
+    });
+  }
+  
+  function addEntryToHistory(e) {
+    const entryHistory = $("#entryHistory");
+    // Drop the "No entries yet" placeholder, then add the new entry after the existing ones
+    entryHistory.children(":not(.entry-item, #loadOlderEntries)").remove();
+    entryHistory.append(renderEntryItem(e));
+  }
+  
+  function renderEntryItem(e) {
+    return $(
+        `<div class="entry-item fade-in">
+            <div class="entry-date"><i class="fas fa-calendar me-1"></i>${e.date}</div>
+            <p>${e.entry}</p>
+        </div>`
+    );
+  }
+  
   function getSentiment() {
     showLoading();
     
@@ -855,9 +888,7 @@ function displaySentimentResult(sentiment, period = "All Entries", targetElement
     updateDashboard();
     
     // Load existing entries
-    $.get("/get_entries", (response) => {
-        updateEntryHistory(response.entries);
-    });
+    loadEntries();
     
     // Add subtle animations to cards on load
     setTimeout(() => {